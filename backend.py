@@ -1,18 +1,23 @@
 from __future__ import annotations
 
+import fcntl
+import functools
+import heapq
 import json
 import math
 import os
 import re
 import sqlite3
+import string
 import threading
 import urllib.error
 import urllib.request
 import xml.etree.ElementTree as ET
+from collections import OrderedDict
 from datetime import datetime, date
 from pathlib import Path
 from time import perf_counter
-from typing import Any
+from typing import Any, Collection
 from difflib import SequenceMatcher
 
 from dotenv import load_dotenv
@@ -46,6 +51,9 @@ MAX_SIMILAR_LIMIT = max(DEFAULT_SIMILAR_LIMIT, int(os.getenv("MAX_SIMILAR_LIMIT"
 RUNNING_ON_RENDER = bool(os.getenv("RENDER")) or bool(os.getenv("RENDER_SERVICE_ID"))
 ENABLE_STARTUP_WARMUP = os.getenv("ENABLE_STARTUP_WARMUP", "0" if RUNNING_ON_RENDER else "1") == "1"
 DEBUG_RANKING = os.getenv("DEBUG_RANKING", "0") == "1"
+SQLITE_MMAP_SIZE = max(0, int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024))))
+SQLITE_CACHE_SIZE_KB = max(2048, int(os.getenv("SQLITE_CACHE_SIZE_KB", str(64 * 1024))))
+CHECK_RESULT_CACHE_SIZE = max(0, int(os.getenv("CHECK_RESULT_CACHE_SIZE", "256")))
 MARK_LIGHT_SELECT = """
     m.id,
     m.reg_no,
@@ -63,6 +71,10 @@ MARK_LIGHT_SELECT = """
     m.renewal_due,
     m.class_codes
 """
+_WHITESPACE_RE = re.compile(r"\s+")
+DOWNLOAD_CHUNK_BYTES = 1 << 20
+DOWNLOAD_PROGRESS_BYTES = 64 << 20
+SQLITE_HEADER = b"SQLite format 3\x00"
 _download_lock = threading.Lock()
 _download_attempted = False
 _supplemental_marks_cache: list[dict[str, Any]] | None = None
@@ -71,8 +83,16 @@ _runtime_schema_lock = threading.Lock()
 _runtime_schema_mtime: float | None = None
 _warmup_lock = threading.Lock()
 _warmup_started = False
+CLOSED_STATUSES = frozenset({"dead", "expired", "withdrawn", "revoked", "cancelled", "removed"})
+_available_countries_cache: set[tuple[str, ...]] = set()
+_thread_db = threading.local()
+_check_result_lock = threading.Lock()
+_check_result_cache: OrderedDict[tuple[Any, ...], dict[str, Any]] = OrderedDict()
 
 app = Flask(__name__)
+# /check responses carry dozens of match dicts; keep keys in insertion order
+# instead of sorting every dict on each encode.
+app.json.sort_keys = False
 ukipo_fallback_service = UKIPOFallbackService(timeout_seconds=UKIPO_FALLBACK_TIMEOUT)
 
 
@@ -95,14 +115,23 @@ else:
     CORS(app)
 
 
+class _SpaceDefaultTable(dict):
+    """str.translate table that maps every character it does not list to a space."""
+
+    def __missing__(self, codepoint: int) -> str:
+        return " "
+
+
+_DB_NORM_TABLE = _SpaceDefaultTable({ord(c): c for c in string.ascii_lowercase + string.digits})
+_NORMALIZE_TABLE = _SpaceDefaultTable(_DB_NORM_TABLE)
+_NORMALIZE_TABLE.update({ord("'"): None, ord("’"): None})
+_DIGITS_ONLY_TABLE = _SpaceDefaultTable({ord(c): c for c in string.digits})
+
+
 def normalize_text(text: str) -> str:
-    text = (text or "").lower()
-    text = text.replace("’", "'")
-    text = text.replace("'", "")
-    text = text.replace("-", " ")
-    text = re.sub(r"[^a-z0-9 ]+", " ", text)
-    text = re.sub(r"\s+", " ", text).strip()
-    return text
+    # Apostrophes are dropped ("gail's" -> "gails"); anything else outside
+    # [a-z0-9] becomes a single space.
+    return " ".join((text or "").lower().translate(_NORMALIZE_TABLE).split())
 
 
 def norm_text(s: str) -> str:
@@ -395,17 +424,14 @@ def normalized_mark_sql(column: str = "m.mark_text") -> str:
 
 
 def db_norm_text(text: str) -> str:
-    text = (text or "").lower()
-    text = re.sub(r"[^a-z0-9]+", " ", text)
-    text = re.sub(r"\s+", " ", text).strip()
-    return text
+    return " ".join((text or "").lower().translate(_DB_NORM_TABLE).split())
 
 
 def needs_runtime_normalized_search(term: str) -> bool:
     raw = (term or "").strip()
     if not raw:
         return False
-    lowered = re.sub(r"\s+", " ", raw.lower()).strip()
+    lowered = _WHITESPACE_RE.sub(" ", raw.lower()).strip()
     return normalize_text(raw) != lowered
 
 
@@ -431,7 +457,7 @@ def search_norm_variants(term: str, term_norm: str) -> list[str]:
                 extra_variants.append(" ".join(split_tokens))
 
     for candidate in extra_variants:
-        candidate = re.sub(r"\s+", " ", candidate).strip()
+        candidate = _WHITESPACE_RE.sub(" ", candidate).strip()
         if candidate and candidate not in variants:
             variants.append(candidate)
     return variants
@@ -444,8 +470,7 @@ def prefix_upper_bound(prefix: str) -> str:
 def parse_classes(s: str) -> list[str]:
     if not s:
         return []
-    parts = re.split(r"[^0-9]+", s)
-    return [p for p in parts if p]
+    return s.translate(_DIGITS_ONLY_TABLE).split()
 
 
 def parse_pagination_value(value: Any, default: int, minimum: int = 0, maximum: int = 100) -> int:
@@ -471,52 +496,63 @@ def now_date() -> date:
     return datetime.utcnow().date()
 
 
-def years_since(date_str: str) -> int | None:
-    if not date_str:
-        return None
+@functools.lru_cache(maxsize=4096)
+def parse_iso_date(value: str) -> date | None:
     try:
-        d = datetime.strptime(date_str, "%Y-%m-%d").date()
+        if len(value) == 10 and value[4] == "-" and value[7] == "-":
+            # fromisoformat is much cheaper than strptime for the stored shape.
+            return date.fromisoformat(value)
+        return datetime.strptime(value, "%Y-%m-%d").date()
     except ValueError:
         return None
-    delta = now_date() - d
+
+
+def years_since(date_str: str, today: date | None = None) -> int | None:
+    if not date_str:
+        return None
+    d = parse_iso_date(date_str)
+    if d is None:
+        return None
+    delta = (today or now_date()) - d
     if delta.days < 0:
         return 0
     return delta.days // 365
 
 
-def is_active(status: str, expired: str) -> bool:
-    status_norm = (status or "").strip().lower()
-    if status_norm in {"dead", "expired", "withdrawn", "revoked", "cancelled", "removed"}:
+def is_closed_status(status: str) -> bool:
+    status_norm = (status or "").lower()
+    return status_norm in CLOSED_STATUSES or status_norm.strip() in CLOSED_STATUSES
+
+
+def is_active(status: str, expired: str, today: date | None = None) -> bool:
+    if is_closed_status(status):
         return False
     if expired:
-        try:
-            exp = datetime.strptime(expired, "%Y-%m-%d").date()
-            if exp < now_date():
-                return False
-        except ValueError:
-            pass
+        exp = parse_iso_date(expired)
+        if exp is not None and exp < (today or now_date()):
+            return False
     return True
 
 
-def status_display(status: str, expired: str) -> str:
-    status_norm = (status or "").strip().lower()
-    if status_norm in {"dead", "expired", "withdrawn", "revoked", "cancelled", "removed"}:
+def status_display(status: str, expired: str, today: date | None = None) -> str:
+    if is_closed_status(status):
         return "Closed"
     if expired:
-        try:
-            exp = datetime.strptime(expired, "%Y-%m-%d").date()
-            if exp < now_date():
-                return "Closed"
-        except ValueError:
-            pass
+        exp = parse_iso_date(expired)
+        if exp is not None and exp < (today or now_date()):
+            return "Closed"
     return status or "—"
 
 
+@functools.lru_cache(maxsize=4096)
 def similarity(a: str, b: str) -> float:
     if not a or not b:
         return 0.0
     if a == b:
         return 1.0
+    if set(a).isdisjoint(b):
+        # No character in common means no matching blocks at all.
+        return 0.0
     return SequenceMatcher(None, a, b).ratio()
 
 
@@ -557,6 +593,7 @@ def damerau_levenshtein_distance(a: str, b: str, max_distance: int = 3) -> int:
     return prev[-1]
 
 
+@functools.lru_cache(maxsize=4096)
 def typo_similarity(term_norm: str, mark_norm: str) -> float:
     term_tokens = tokenize(term_norm)
     mark_tokens = tokenize(mark_norm)
@@ -572,15 +609,10 @@ def typo_similarity(term_norm: str, mark_norm: str) -> float:
     return max(0.0, 1.0 - (distance / max(len(a), len(b), 1)))
 
 
-def build_fts_query(norm: str) -> str:
-    if not norm:
-        return ""
-    tokens = norm.split()
-    return " ".join([f"{t}*" for t in tokens])
-
-
-def tokenize(norm: str) -> list[str]:
-    return [t for t in norm.split() if t]
+@functools.lru_cache(maxsize=8192)
+def tokenize(norm: str) -> tuple[str, ...]:
+    # A tuple, so callers cannot mutate the cached value.
+    return tuple(norm.split())
 
 
 COMMON_SEARCH_TOKENS = {
@@ -710,6 +742,7 @@ def should_try_remote_fallback(term_norm: str) -> bool:
     return True
 
 
+@functools.lru_cache(maxsize=8192)
 def token_root(token: str) -> str:
     token = (token or "").strip()
     for suffix in ("buddhism", "buddhist", "ists", "isms", "ment", "tion", "ing", "ism", "ist", "ers", "ies", "es", "ed", "s"):
@@ -839,6 +872,7 @@ def is_structurally_relevant_multiword(term_norm: str, mark_norm: str, sim: floa
     return False
 
 
+@functools.lru_cache(maxsize=4096)
 def local_similarity_score(term_norm: str, mark_norm: str) -> float:
     if not term_norm or not mark_norm:
         return 0.0
@@ -891,13 +925,55 @@ def open_db() -> sqlite3.Connection:
     con.row_factory = sqlite3.Row
     con.execute("PRAGMA busy_timeout=5000")
     con.execute("PRAGMA case_sensitive_like=ON")
-    con.execute("PRAGMA journal_mode=WAL")
+    journal_mode = con.execute("PRAGMA journal_mode=WAL").fetchone()[0]
+    if str(journal_mode).lower() != "wal":
+        app.logger.warning("SQLite stayed in journal_mode=%s instead of WAL for %s", journal_mode, DB_PATH)
     con.execute("PRAGMA synchronous=NORMAL")
     con.execute("PRAGMA temp_store=MEMORY")
+    # Map the read-mostly index into memory so page reads skip pread(), and
+    # give each connection a larger page cache. cache_size < 0 is in KiB.
+    con.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+    con.execute(f"PRAGMA cache_size=-{SQLITE_CACHE_SIZE_KB}")
     ensure_runtime_schema(con)
     return con
 
 
+def get_db() -> sqlite3.Connection:
+    """Return this thread's long-lived connection, opening it on first use.
+
+    Request handlers reuse it instead of paying for connect + PRAGMAs and a
+    cold page cache on every call. It is reopened when DB_PATH points at a
+    different file, e.g. after ensure_index() swapped in a fresh download.
+    """
+    try:
+        stat = DB_PATH.stat()
+        file_id = (stat.st_dev, stat.st_ino)
+    except FileNotFoundError:
+        file_id = None
+
+    con = getattr(_thread_db, "con", None)
+    if con is not None and _thread_db.file_id == file_id:
+        ensure_runtime_schema(con)
+        return con
+    if con is not None:
+        con.close()
+
+    con = open_db()
+    _thread_db.con = con
+    _thread_db.file_id = file_id
+    return con
+
+
+@app.teardown_request
+def release_db_transaction(exc: BaseException | None) -> None:
+    # The per-thread connection outlives the request, so a write that failed
+    # halfway (e.g. in cache_fallback_results) would otherwise keep its
+    # transaction, and the write lock, open for the other workers.
+    con = getattr(_thread_db, "con", None)
+    if con is not None and con.in_transaction:
+        con.rollback()
+
+
 def run_lightweight_warmup(*, allow_index_download: bool = False) -> tuple[bool, float, str]:
     if allow_index_download:
         ok, msg = ensure_index()
@@ -943,6 +1019,90 @@ def has_index() -> bool:
     return DB_PATH.exists()
 
 
+def download_validator_path(tmp_path: Path) -> Path:
+    return tmp_path.with_name(tmp_path.name + ".validator")
+
+
+def discard_partial_download(tmp_path: Path) -> None:
+    tmp_path.unlink(missing_ok=True)
+    download_validator_path(tmp_path).unlink(missing_ok=True)
+
+
+def download_index_file(tmp_path: Path) -> None:
+    """Stream DB_URL into tmp_path in 1 MiB chunks.
+
+    A partial file left behind by an earlier attempt (e.g. a worker killed by
+    the gunicorn timeout mid-download) is resumed with a Range request rather
+    than fetched again from zero. The ETag (or Last-Modified) of the first
+    response is kept next to it and sent as If-Range, so a changed release
+    asset is fetched in full instead of being spliced onto the old bytes. On
+    a short read the partial file is kept; anything that is not a complete
+    SQLite file is discarded.
+    """
+    validator_path = download_validator_path(tmp_path)
+    validator = validator_path.read_text().strip() if validator_path.exists() else ""
+    resume_from = tmp_path.stat().st_size if tmp_path.exists() and validator else 0
+    req = urllib.request.Request(DB_URL)
+    if resume_from:
+        req.add_header("Range", f"bytes={resume_from}-")
+        req.add_header("If-Range", validator)
+
+    try:
+        response = urllib.request.urlopen(req)
+    except urllib.error.HTTPError as exc:
+        if exc.code != 416 or not resume_from:
+            raise
+        # The partial file does not line up with the remote one; start over.
+        discard_partial_download(tmp_path)
+        resume_from = 0
+        response = urllib.request.urlopen(DB_URL)
+
+    with response:
+        if resume_from and response.status != 206:
+            resume_from = 0
+        if not resume_from:
+            validator = response.headers.get("ETag") or response.headers.get("Last-Modified") or ""
+            if validator:
+                validator_path.write_text(validator)
+            else:
+                validator_path.unlink(missing_ok=True)
+        content_length = response.headers.get("Content-Length", "")
+        expected_size = resume_from + int(content_length) if content_length.isdigit() else None
+        written = resume_from
+        next_progress = written + DOWNLOAD_PROGRESS_BYTES
+        if resume_from:
+            app.logger.info("Resuming index download at %.1f MiB", resume_from / (1 << 20))
+
+        with tmp_path.open("ab" if resume_from else "wb") as handle:
+            while True:
+                chunk = response.read(DOWNLOAD_CHUNK_BYTES)
+                if not chunk:
+                    break
+                handle.write(chunk)
+                written += len(chunk)
+                if written >= next_progress:
+                    if expected_size:
+                        app.logger.info(
+                            "Index download %.1f/%.1f MiB", written / (1 << 20), expected_size / (1 << 20)
+                        )
+                    else:
+                        app.logger.info("Index download %.1f MiB", written / (1 << 20))
+                    next_progress += DOWNLOAD_PROGRESS_BYTES
+
+    # Check the file itself rather than what this call wrote, so bytes that
+    # got onto the partial file some other way cannot pass the size check.
+    size = tmp_path.stat().st_size
+    if expected_size is not None and size < expected_size:
+        raise OSError(f"incomplete download ({size} of {expected_size} bytes)")
+
+    with tmp_path.open("rb") as handle:
+        header = handle.read(len(SQLITE_HEADER))
+    if (expected_size is not None and size != expected_size) or header != SQLITE_HEADER:
+        discard_partial_download(tmp_path)
+        raise OSError("downloaded index is not a valid SQLite file")
+    validator_path.unlink(missing_ok=True)
+
+
 def ensure_index() -> tuple[bool, str]:
     global _download_attempted
 
@@ -961,9 +1121,18 @@ def ensure_index() -> tuple[bool, str]:
 
         try:
             DB_PATH.parent.mkdir(parents=True, exist_ok=True)
-            tmp_path = DB_PATH.with_suffix(".download")
-            urllib.request.urlretrieve(DB_URL, tmp_path)
-            os.replace(tmp_path, DB_PATH)
+            # _download_lock only covers this process; the file lock keeps the
+            # other gunicorn workers from appending to the same partial file.
+            with DB_PATH.with_suffix(".lock").open("w") as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                if has_index():
+                    return True, ""
+                tmp_path = DB_PATH.with_suffix(".download")
+                download_index_file(tmp_path)
+                os.replace(tmp_path, DB_PATH)
+            _available_countries_cache.clear()
+            with _check_result_lock:
+                _check_result_cache.clear()
         except Exception as exc:
             return False, f"Failed to download index from TRADEMARK_DB_URL: {exc}"
 
@@ -1104,21 +1273,35 @@ def load_supplemental_marks() -> list[dict[str, Any]]:
     return cleaned
 
 
+_ALL_COUNTRIES = ("United Kingdom", "European Union", "United States", "Rest of World")
+_COUNTRY_ALIASES: dict[str, tuple[str, ...]] = {
+    "all": _ALL_COUNTRIES,
+    "all countries": _ALL_COUNTRIES,
+    "any": _ALL_COUNTRIES,
+    "uk": ("United Kingdom",),
+    "united kingdom": ("United Kingdom",),
+    "uk only": ("United Kingdom",),
+    "eu": ("European Union",),
+    "european union": ("European Union",),
+    "eu only": ("European Union",),
+    "us": ("United States",),
+    "united states": ("United States",),
+    "us only": ("United States",),
+    "uk & eu": ("United Kingdom", "European Union"),
+    "uk and eu": ("United Kingdom", "European Union"),
+    "uk+eu": ("United Kingdom", "European Union"),
+    "rest of world": ("Rest of World",),
+    "row": ("Rest of World",),
+    "world": ("Rest of World",),
+}
+
+
+def _resolve_countries(country: str) -> tuple[str, ...]:
+    return _COUNTRY_ALIASES.get((country or "").strip().lower(), (country,))
+
+
 def resolve_countries(country: str) -> list[str]:
-    c = (country or "").strip().lower()
-    if c in {"all", "all countries", "any"}:
-        return ["United Kingdom", "European Union", "United States", "Rest of World"]
-    if c in {"uk", "united kingdom", "uk only"}:
-        return ["United Kingdom"]
-    if c in {"eu", "european union", "eu only"}:
-        return ["European Union"]
-    if c in {"us", "united states", "us only"}:
-        return ["United States"]
-    if c in {"uk & eu", "uk and eu", "uk+eu"}:
-        return ["United Kingdom", "European Union"]
-    if c in {"rest of world", "row", "world"}:
-        return ["Rest of World"]
-    return [country]
+    return list(_resolve_countries(country))
 
 
 def expanded_countries_for_query(country: str) -> list[str]:
@@ -1132,6 +1315,42 @@ def expanded_countries_for_query(country: str) -> list[str]:
     return expanded_countries
 
 
+# Country lists only come in a handful of sizes, so the IN (...) statements are
+# built once per size and handed to SQLite as identical strings, which keeps
+# its prepared-statement cache warm.
+@functools.lru_cache(maxsize=16)
+def in_placeholders(count: int) -> str:
+    return ",".join(["?"] * count)
+
+
+@functools.lru_cache(maxsize=16)
+def exact_norm_sql(country_count: int) -> str:
+    return f"""
+        SELECT {MARK_LIGHT_SELECT}
+        FROM marks m
+        WHERE m.country IN ({in_placeholders(country_count)})
+          AND m.mark_text_norm = ?
+        LIMIT ?
+    """
+
+
+@functools.lru_cache(maxsize=16)
+def norm_range_sql(country_count: int) -> str:
+    return f"""
+        SELECT {MARK_LIGHT_SELECT}
+        FROM marks m
+        WHERE m.country IN ({in_placeholders(country_count)})
+          AND m.mark_text_norm >= ?
+          AND m.mark_text_norm < ?
+        LIMIT ?
+    """
+
+
+@functools.lru_cache(maxsize=16)
+def country_available_sql(country_count: int) -> str:
+    return "SELECT 1 FROM marks WHERE country IN (" + in_placeholders(country_count) + ") LIMIT 1"
+
+
 def query_exact_candidates(
     con: sqlite3.Connection,
     term: str,
@@ -1140,7 +1359,6 @@ def query_exact_candidates(
     limit: int = 25,
 ) -> tuple[list[sqlite3.Row], dict[str, float]]:
     countries = expanded_countries_for_query(country)
-    placeholders = ",".join(["?"] * len(countries))
     variants = search_norm_variants(term, term_norm)
     candidates: list[sqlite3.Row] = []
     seen_ids: set[int] = set()
@@ -1153,13 +1371,7 @@ def query_exact_candidates(
     for variant in variants:
         start = perf_counter()
         rows = con.execute(
-            f"""
-            SELECT {MARK_LIGHT_SELECT}
-            FROM marks m
-            WHERE m.country IN ({placeholders})
-              AND m.mark_text_norm = ?
-            LIMIT ?
-            """,
+            exact_norm_sql(len(countries)),
             (*countries, variant, min(limit, 20)),
         ).fetchall()
         elapsed_ms = (perf_counter() - start) * 1000
@@ -1185,21 +1397,13 @@ def query_related_prefix_candidates(
     limit: int = 15,
 ) -> tuple[list[sqlite3.Row], float]:
     countries = expanded_countries_for_query(country)
-    placeholders = ",".join(["?"] * len(countries))
     if len(term_norm) < 4:
         return [], 0.0
 
     upper = prefix_upper_bound(term_norm)
     start = perf_counter()
     rows = con.execute(
-        f"""
-        SELECT {MARK_LIGHT_SELECT}
-        FROM marks m
-        WHERE m.country IN ({placeholders})
-          AND m.mark_text_norm >= ?
-          AND m.mark_text_norm < ?
-        LIMIT ?
-        """,
+        norm_range_sql(len(countries)),
         (*countries, term_norm, upper, min(limit, 20)),
     ).fetchall()
     return rows, (perf_counter() - start) * 1000
@@ -1214,7 +1418,7 @@ def query_candidates(
     skip_exact_search: bool = False,
 ) -> tuple[list[sqlite3.Row], dict[str, float]]:
     countries = expanded_countries_for_query(country)
-    placeholders = ",".join(["?"] * len(countries))
+    placeholders = in_placeholders(len(countries))
     variants = search_norm_variants(term, term_norm)
     punctuation_fast_path = needs_runtime_normalized_search(term)
     candidates: list[sqlite3.Row] = []
@@ -1256,7 +1460,8 @@ def query_candidates(
     def rank_rows(rows: list[sqlite3.Row]) -> list[sqlite3.Row]:
         start = perf_counter()
         shortlist = rows[: min(len(rows), max(MAX_PYTHON_SCORE_ROWS, 30 if not multi_word_query else 60))]
-        ranked = sorted(
+        ranked = heapq.nlargest(
+            60 if multi_word_query else limit,
             shortlist,
             key=lambda row: (
                 is_active(row["status"], row["expired"]),
@@ -1265,10 +1470,9 @@ def query_candidates(
                 token_overlap_ratio(term_norm, row["mark_text_norm"] or ""),
                 local_similarity_score(term_norm, row["mark_text_norm"] or ""),
             ),
-            reverse=True,
         )
         timings["python_scoring_ms"] += (perf_counter() - start) * 1000
-        return ranked[: (60 if multi_word_query else limit)]
+        return ranked
 
     def has_high_similarity(rows: list[sqlite3.Row]) -> bool:
         for row in rows[:MAX_PYTHON_SCORE_ROWS]:
@@ -1281,13 +1485,7 @@ def query_candidates(
         for variant in variants:
             start = perf_counter()
             rows = con.execute(
-                f"""
-                SELECT {MARK_LIGHT_SELECT}
-                FROM marks m
-                WHERE m.country IN ({placeholders})
-                  AND m.mark_text_norm = ?
-                LIMIT ?
-                """,
+                exact_norm_sql(len(countries)),
                 (*countries, variant, min(limit, max_candidates)),
             ).fetchall()
             elapsed_ms = (perf_counter() - start) * 1000
@@ -1307,14 +1505,7 @@ def query_candidates(
         upper = prefix_upper_bound(variant)
         start = perf_counter()
         rows = con.execute(
-            f"""
-            SELECT {MARK_LIGHT_SELECT}
-            FROM marks m
-            WHERE m.country IN ({placeholders})
-              AND m.mark_text_norm >= ?
-              AND m.mark_text_norm < ?
-            LIMIT ?
-            """,
+            norm_range_sql(len(countries)),
             (*countries, variant, upper, min(max_candidates, whole_prefix_limit)),
         ).fetchall()
         timings["prefix_sql_ms"] += (perf_counter() - start) * 1000
@@ -1342,14 +1533,7 @@ def query_candidates(
             upper = prefix_upper_bound(family_prefix)
             start = perf_counter()
             rows = con.execute(
-                f"""
-                SELECT {MARK_LIGHT_SELECT}
-                FROM marks m
-                WHERE m.country IN ({placeholders})
-                  AND m.mark_text_norm >= ?
-                  AND m.mark_text_norm < ?
-                LIMIT ?
-                """,
+                norm_range_sql(len(countries)),
                 (*countries, family_prefix, upper, min(max_candidates, phrase_family_limit)),
             ).fetchall()
             timings["prefix_sql_ms"] += (perf_counter() - start) * 1000
@@ -1381,14 +1565,7 @@ def query_candidates(
         # 3b) Bounded richer backfill for first-token phrase families, e.g. "lucky ..."
         start = perf_counter()
         rows = con.execute(
-            f"""
-            SELECT {MARK_LIGHT_SELECT}
-            FROM marks m
-            WHERE m.country IN ({placeholders})
-              AND m.mark_text_norm >= ?
-              AND m.mark_text_norm < ?
-            LIMIT ?
-            """,
+            norm_range_sql(len(countries)),
             (*countries, first_token, first_upper, min(max_candidates, first_token_backfill_limit)),
         ).fetchall()
         timings["prefix_sql_ms"] += (perf_counter() - start) * 1000
@@ -1426,14 +1603,7 @@ def query_candidates(
         upper = prefix_upper_bound(token_prefix)
         start = perf_counter()
         rows = con.execute(
-            f"""
-            SELECT {MARK_LIGHT_SELECT}
-            FROM marks m
-            WHERE m.country IN ({placeholders})
-              AND m.mark_text_norm >= ?
-              AND m.mark_text_norm < ?
-            LIMIT ?
-            """,
+            norm_range_sql(len(countries)),
             (*countries, token_prefix, upper, min(max_candidates, token_prefix_limit)),
         ).fetchall()
         timings["prefix_sql_ms"] += (perf_counter() - start) * 1000
@@ -1484,11 +1654,14 @@ def query_candidates(
     return rank_rows(candidates), timings
 
 
-def summarize_supplemental_mark(item: dict[str, Any], term_norm: str) -> dict[str, Any]:
+def summarize_supplemental_mark(item: dict[str, Any], term_norm: str, today: date | None = None) -> dict[str, Any]:
+    today = today or now_date()
     mark_text = (item.get("mark_text") or "").strip()
     mark_norm = item.get("mark_text_norm") or norm_text(mark_text)
     expired = item.get("expired", "") or ""
     filed = item.get("filed", "") or ""
+    status = item.get("status", "")
+    owner_name = item.get("owner_name", "")
     class_codes = item.get("class_codes") or []
     if isinstance(class_codes, str):
         class_codes = [c for c in class_codes.split(",") if c]
@@ -1496,19 +1669,19 @@ def summarize_supplemental_mark(item: dict[str, Any], term_norm: str) -> dict[st
     return {
         "reg_no": item.get("reg_no", ""),
         "mark_text": mark_text,
-        "owner_name": item.get("owner_name", ""),
-        "owner_type": item.get("owner_type") or infer_owner_type(item.get("owner_name", "")),
+        "owner_name": owner_name,
+        "owner_type": item.get("owner_type") or infer_owner_type(owner_name),
         "country": item.get("country", "United Kingdom"),
-        "status": item.get("status", ""),
-        "status_display": status_display(item.get("status", ""), expired),
+        "status": status,
+        "status_display": status_display(status, expired, today),
         "category": item.get("category", ""),
         "mark_type": item.get("mark_type", "Word"),
         "filed": filed,
         "registered": item.get("registered", ""),
         "expired": expired,
         "renewal_due": item.get("renewal_due", ""),
-        "age_years": years_since(filed) if filed else None,
-        "active": is_active(item.get("status", ""), expired),
+        "age_years": years_since(filed, today) if filed else None,
+        "active": is_active(status, expired, today),
         "class_codes": class_codes,
         "goods_services": clean_goods_services_display(item.get("goods_services", "")),
         "source_url": item.get("source_url", ""),
@@ -1539,9 +1712,11 @@ def query_supplemental_candidates(
     country: str,
     limit: int = 10,
     exact_only: bool = False,
+    today: date | None = None,
 ) -> list[dict[str, Any]]:
     countries = resolve_countries(country)
     records = load_supplemental_marks()
+    today = today or now_date()
     matches: list[dict[str, Any]] = []
 
     for item in records:
@@ -1556,14 +1731,13 @@ def query_supplemental_candidates(
         sim = local_similarity_score(term_norm, mark_norm)
         if exact_only:
             if mark_norm == term_norm:
-                matches.append(summarize_supplemental_mark(item, term_norm))
+                matches.append(summarize_supplemental_mark(item, term_norm, today))
             continue
 
         if mark_norm == term_norm or sim >= 0.86 or term_norm in mark_norm or mark_norm in term_norm:
-            matches.append(summarize_supplemental_mark(item, term_norm))
+            matches.append(summarize_supplemental_mark(item, term_norm, today))
 
-    matches.sort(key=lambda m: (m.get("active"), m.get("similarity", 0.0)), reverse=True)
-    return matches[:limit]
+    return heapq.nlargest(limit, matches, key=lambda m: (m.get("active"), m.get("similarity", 0.0)))
 
 
 def _cache_is_fresh(fetched_at: str) -> bool:
@@ -1656,7 +1830,8 @@ def search_ukipo_fallback(term: str, limit: int = 10) -> list[dict[str, Any]]:
 
 
 def query_patents(con: sqlite3.Connection, term_norm: str, limit: int = 25) -> list[sqlite3.Row]:
-    # Fast prefix-only search to avoid long-running FTS scans
+    # Fast prefix-only search to avoid long-running FTS scans. With an index on
+    # each of the three columns SQLite plans the OR as a multi-index OR.
     if len(term_norm) < 4:
         return []
 
@@ -1700,13 +1875,21 @@ def fetch_mark_details_by_ids(con: sqlite3.Connection, ids: list[int]) -> dict[i
     return {int(row["id"]): row for row in rows}
 
 
-def score_match_conflict(match: dict[str, Any], term_norm: str, reference_classes: list[str]) -> float:
+def shares_reference_class(match: dict[str, Any], reference_classes: Collection[str]) -> bool:
+    if not reference_classes:
+        return False
+    # frozenset() of a frozenset is the same object, so callers that score many
+    # matches hoist the conversion once and pass the frozenset through.
+    return not frozenset(reference_classes).isdisjoint(match.get("class_codes", []))
+
+
+def score_match_conflict(match: dict[str, Any], term_norm: str, reference_classes: Collection[str]) -> float:
     mark_norm = norm_text(match.get("mark_text", ""))
     sim = float(match.get("similarity", 0.0))
     typo_sim = typo_similarity(term_norm, mark_norm)
     exact = mark_norm == term_norm
     close_phrase = is_close_phrase_match(term_norm, mark_norm, sim)
-    same_class = bool(reference_classes and (set(match.get("class_codes", [])) & set(reference_classes)))
+    same_class = shares_reference_class(match, reference_classes)
     active = bool(match.get("active"))
 
     score = 0.0
@@ -1742,6 +1925,8 @@ def score_risk(matches: list[dict[str, Any]], reference_classes: list[str], term
     if not matches:
         return "low", "Only weak or inactive matches found"
 
+    reference_set = frozenset(reference_classes)
+
     scored: list[tuple[float, dict[str, Any], bool, bool]] = []
     active_same_class_strong = 0
     active_cross_class_strong = 0
@@ -1753,9 +1938,9 @@ def score_risk(matches: list[dict[str, Any]], reference_classes: list[str], term
         sim = float(match.get("similarity", 0.0))
         typo_sim = typo_similarity(term_norm, mark_norm)
         exact = mark_norm == term_norm
-        same_class = bool(reference_classes and (set(match.get("class_codes", [])) & set(reference_classes)))
+        same_class = shares_reference_class(match, reference_set)
         active = bool(match.get("active"))
-        score = score_match_conflict(match, term_norm, reference_classes)
+        score = score_match_conflict(match, term_norm, reference_set)
         scored.append((score, match, exact, same_class))
         if typo_sim >= 0.82:
             strongest_typo_like += 1
@@ -1794,13 +1979,19 @@ def score_risk(matches: list[dict[str, Any]], reference_classes: list[str], term
 
 
 def country_available(con: sqlite3.Connection, country: str) -> bool:
-    countries = resolve_countries(country)
-    placeholders = ",".join(["?"] * len(countries))
+    countries = _resolve_countries(country)
+    # Only positive answers are cached: the index only gains rows until
+    # ensure_index() swaps in a new download, which clears this cache.
+    if countries in _available_countries_cache:
+        return True
     row = con.execute(
-        "SELECT 1 FROM marks WHERE country IN (" + placeholders + ") LIMIT 1",
+        country_available_sql(len(countries)),
         (*countries,),
     ).fetchone()
-    return row is not None
+    if row is None:
+        return False
+    _available_countries_cache.add(countries)
+    return True
 
 
 def clean_goods_services_display(text: str) -> str:
@@ -1826,36 +2017,53 @@ def clean_goods_services_display(text: str) -> str:
     return text
 
 
-def summarize_mark(row: sqlite3.Row, term_norm: str) -> dict[str, Any]:
+def row_mark_norm(row: sqlite3.Row) -> str:
+    """Return norm_text(row["mark_text"]), reusing the stored column when possible.
+
+    The index stores mark_text_norm with apostrophes turned into spaces
+    ("gail s"), while norm_text drops them ("gails"). For any mark without an
+    apostrophe the two agree, so only those rows need normalizing again.
+    """
     mark_text = row["mark_text"] or ""
-    mark_norm = norm_text(mark_text)
+    stored = row["mark_text_norm"] if "mark_text_norm" in row.keys() else None
+    if stored is not None and "'" not in mark_text and "’" not in mark_text:
+        return stored
+    return norm_text(mark_text)
+
+
+def summarize_mark(row: sqlite3.Row, term_norm: str, today: date | None = None) -> dict[str, Any]:
+    today = today or now_date()
+    mark_text = row["mark_text"] or ""
+    mark_norm = row_mark_norm(row)
     sim = local_similarity_score(term_norm, mark_norm)
 
     filed = row["filed"] or ""
     registered = row["registered"] or ""
     expired = row["expired"] or ""
+    # Light and detail rows carry different columns; look the names up once.
+    columns = set(row.keys())
 
     return {
-        "_id": int(row["id"]) if "id" in row.keys() and row["id"] is not None else None,
+        "_id": int(row["id"]) if "id" in columns and row["id"] is not None else None,
         "reg_no": row["reg_no"],
         "mark_text": mark_text,
         "owner_name": row["owner_name"],
-        "owner_type": row["owner_type"] if "owner_type" in row.keys() else infer_owner_type(row["owner_name"] or ""),
+        "owner_type": row["owner_type"] if "owner_type" in columns else infer_owner_type(row["owner_name"] or ""),
         "country": row["country"],
         "status": row["status"],
-        "status_display": status_display(row["status"], expired),
-        "category": row["category"] if "category" in row.keys() else "",
-        "mark_type": row["mark_type"] if "mark_type" in row.keys() else "",
+        "status_display": status_display(row["status"], expired, today),
+        "category": row["category"] if "category" in columns else "",
+        "mark_type": row["mark_type"] if "mark_type" in columns else "",
         "filed": filed,
         "registered": registered,
         "expired": expired,
         "renewal_due": row["renewal_due"],
-        "age_years": years_since(filed) if filed else None,
-        "active": is_active(row["status"], expired),
+        "age_years": years_since(filed, today) if filed else None,
+        "active": is_active(row["status"], expired, today),
         "class_codes": (row["class_codes"] or "").split(",") if row["class_codes"] else [],
-        "goods_services": clean_goods_services_display(row["goods_services"]) if "goods_services" in row.keys() else "",
-        "source_url": row["source_url"] if "source_url" in row.keys() else "",
-        "data_source": row["data_source"] if "data_source" in row.keys() else "local_database",
+        "goods_services": clean_goods_services_display(row["goods_services"]) if "goods_services" in columns else "",
+        "source_url": row["source_url"] if "source_url" in columns else "",
+        "data_source": row["data_source"] if "data_source" in columns else "local_database",
         "similarity": round(sim, 4),
     }
 
@@ -1891,13 +2099,13 @@ def determine_reference_classes(matches: list[dict[str, Any]], class_filter: lis
     return []
 
 
-def rank_mark(match: dict[str, Any], term_norm: str, reference_classes: list[str]) -> tuple:
+def rank_mark(match: dict[str, Any], term_norm: str, reference_classes: Collection[str]) -> tuple:
     mark_norm = norm_text(match.get("mark_text", ""))
     sim = float(match.get("similarity", 0.0))
     typo_sim = typo_similarity(term_norm, mark_norm)
     exact = mark_norm == term_norm
     close_phrase = is_close_phrase_match(term_norm, mark_norm, sim)
-    same_class = bool(reference_classes and (set(match.get("class_codes", [])) & set(reference_classes)))
+    same_class = shares_reference_class(match, reference_classes)
     overlap = token_overlap_ratio(term_norm, mark_norm)
     weak_first_word_only = generic_first_word_only(term_norm, mark_norm)
     specific_token_matches = query_specific_token_matches(term_norm, mark_norm)
@@ -1924,14 +2132,16 @@ def rank_mark(match: dict[str, Any], term_norm: str, reference_classes: list[str
 
 
 def prioritize_exact_matches(matches: list[dict[str, Any]], term_norm: str, reference_classes: list[str]) -> list[dict[str, Any]]:
+    reference_set = frozenset(reference_classes)
+
     def key(match: dict[str, Any]) -> tuple:
         mark_norm = norm_text(match.get("mark_text", ""))
         exact = mark_norm == term_norm
-        same_class = bool(reference_classes and (set(match.get("class_codes", [])) & set(reference_classes)))
+        same_class = shares_reference_class(match, reference_set)
         return (
             1 if exact and same_class else 0,
             1 if exact else 0,
-            rank_mark(match, term_norm, reference_classes),
+            rank_mark(match, term_norm, reference_set),
         )
 
     return sorted(matches, key=key, reverse=True)
@@ -1944,6 +2154,7 @@ def shortlist_relevant_matches(
     max_results: int = 10,
 ) -> list[dict[str, Any]]:
     ranked = prioritize_exact_matches(matches, term_norm, reference_classes)
+    reference_set = frozenset(reference_classes)
     target_results = min(max_results, 10)
     multi_word_query = len(tokenize(term_norm)) > 1
     minimum_results = min(3 if multi_word_query else 5, len(ranked))
@@ -1952,7 +2163,7 @@ def shortlist_relevant_matches(
         mark_norm = norm_text(match.get("mark_text", ""))
         sim = float(match.get("similarity", 0.0))
         overlap = token_overlap_ratio(term_norm, mark_norm)
-        same_class = bool(reference_classes and (set(match.get("class_codes", [])) & set(reference_classes)))
+        same_class = shares_reference_class(match, reference_set)
         prefix = mark_norm.startswith(term_norm) or term_norm.startswith(mark_norm)
         shared_token = overlap > 0
         close_phrase = is_close_phrase_match(term_norm, mark_norm, sim)
@@ -1994,7 +2205,7 @@ def shortlist_relevant_matches(
         mark_norm = norm_text(match.get("mark_text", ""))
         sim = float(match.get("similarity", 0.0))
         overlap = token_overlap_ratio(term_norm, mark_norm)
-        same_class = bool(reference_classes and (set(match.get("class_codes", [])) & set(reference_classes)))
+        same_class = shares_reference_class(match, reference_set)
         prefix = mark_norm.startswith(term_norm) or term_norm.startswith(mark_norm)
         shared_token = overlap > 0
         specific_token_matches = query_specific_token_matches(term_norm, mark_norm)
@@ -2091,7 +2302,7 @@ def log_ranking_debug(matches: list[dict[str, Any]], term_norm: str, reference_c
             bool(tokenize(term_norm) and tokenize(mark_norm) and tokenize(term_norm)[0] == tokenize(mark_norm)[0]),
             first_and_later_token_match(term_norm, mark_norm),
             phrase_family_match(term_norm, mark_norm),
-            bool(reference_classes and (set(match.get("class_codes", [])) & set(reference_classes))),
+            shares_reference_class(match, reference_classes),
             bool(match.get("active")),
             generic_first_word_only(term_norm, mark_norm),
             mark_norm == term_norm,
@@ -2123,7 +2334,7 @@ def patent_active(status: str, date_not_in_force: str) -> bool:
     return True
 
 
-def summarize_patent(row: sqlite3.Row, term_norm: str) -> dict[str, Any]:
+def summarize_patent(row: sqlite3.Row, term_norm: str, today: date | None = None) -> dict[str, Any]:
     def safe(v: str) -> str:
         return v or ""
 
@@ -2147,11 +2358,58 @@ def summarize_patent(row: sqlite3.Row, term_norm: str) -> dict[str, Any]:
         "date_not_in_force": row["date_not_in_force"],
         "reason_not_in_force": row["reason_not_in_force"],
         "active": patent_active(row["status"], row["date_not_in_force"]),
-        "age_years": years_since(filed) if filed else None,
+        "age_years": years_since(filed, today) if filed else None,
         "similarity": round(sim, 4),
     }
 
 
+def check_result_cache_key(
+    term: str,
+    country: str,
+    class_filter: list[str],
+    include_patents: bool,
+    limit: int,
+    offset: int,
+    today: date,
+) -> tuple[Any, ...]:
+    # The index and supplemental file identities are part of the key, so a
+    # rebuilt or re-downloaded index never serves results from the old one.
+    db_stat = DB_PATH.stat()
+    supplemental_mtime = SUPPLEMENTAL_MARKS_PATH.stat().st_mtime if SUPPLEMENTAL_MARKS_PATH.exists() else None
+    return (
+        term,
+        country,
+        tuple(class_filter),
+        include_patents,
+        limit,
+        offset,
+        today,
+        db_stat.st_ino,
+        db_stat.st_mtime_ns,
+        supplemental_mtime,
+    )
+
+
+def get_cached_check_result(key: tuple[Any, ...]) -> dict[str, Any] | None:
+    if not CHECK_RESULT_CACHE_SIZE:
+        return None
+    with _check_result_lock:
+        result = _check_result_cache.get(key)
+        if result is not None:
+            _check_result_cache.move_to_end(key)
+        return result
+
+
+def store_check_result(key: tuple[Any, ...], result: dict[str, Any]) -> None:
+    if not CHECK_RESULT_CACHE_SIZE:
+        return
+    with _check_result_lock:
+        _check_result_cache[key] = result
+        _check_result_cache.move_to_end(key)
+        while len(_check_result_cache) > CHECK_RESULT_CACHE_SIZE:
+            _check_result_cache.popitem(last=False)
+
+
 @app.route("/")
 def index():
     return render_template("index.html")
@@ -2180,9 +2438,27 @@ def check():
         return jsonify({"error": "Please enter at least 3 characters."}), 400
 
     term_norm = normalize_text(term)
-    con = open_db()
+    today = now_date()
+    cache_key = check_result_cache_key(
+        term,
+        country,
+        class_filter,
+        include_patents,
+        similar_limit,
+        similar_offset,
+        today,
+    )
+    cached_result = get_cached_check_result(cache_key)
+    if cached_result is not None:
+        app.logger.info(
+            "check timing trademark=%r cached total=%.1fms",
+            term,
+            (perf_counter() - request_started) * 1000,
+        )
+        return jsonify(cached_result)
+
+    con = get_db()
     if not country_available(con, country) and not fallback_allowed(country):
-        con.close()
         return jsonify(
             {
                 "error": "No records found for this country in the current index.",
@@ -2216,7 +2492,7 @@ def check():
     supplemental_matches: list[dict[str, Any]] = []
     supplemental_start = perf_counter()
     if not exact_rows:
-        supplemental_matches = query_supplemental_candidates(term_norm, country, exact_only=True)
+        supplemental_matches = query_supplemental_candidates(term_norm, country, exact_only=True, today=today)
     stage_timings["supplemental_lookup_ms"] += (perf_counter() - supplemental_start) * 1000
 
     if exact_rows:
@@ -2268,14 +2544,14 @@ def check():
     patent_rows = query_patents(con, term_norm) if include_patents else []
 
     rows = dedupe_mark_rows(rows)
-    matches = [summarize_mark(r, term_norm) for r in rows]
+    matches = [summarize_mark(r, term_norm, today) for r in rows]
     for match in matches:
         match["data_source"] = result_source if result_source != "local_database" else "local_database"
 
     if not has_exact_or_strong_result(matches, term_norm):
         if not supplemental_matches:
             supplemental_start = perf_counter()
-            supplemental_matches = query_supplemental_candidates(term_norm, country)
+            supplemental_matches = query_supplemental_candidates(term_norm, country, today=today)
             stage_timings["supplemental_lookup_ms"] += (perf_counter() - supplemental_start) * 1000
         if supplemental_matches:
             seen_reg_nos = {m.get("reg_no", "") for m in matches}
@@ -2331,10 +2607,11 @@ def check():
 
     risk, risk_explanation = score_risk(all_matches, reference_classes, term_norm)
 
-    patents = [summarize_patent(r, term_norm) for r in patent_rows]
-    con.close()
-    patents.sort(key=lambda p: (p["active"], p["similarity"]), reverse=True)
-    patents = patents[:50]
+    patents = heapq.nlargest(
+        50,
+        (summarize_patent(r, term_norm, today) for r in patent_rows),
+        key=lambda p: (p["active"], p["similarity"]),
+    )
 
     ukipo_manual_search_url = "https://trademarks.ipo.gov.uk/ipo-tmtext?reset"
 
@@ -2357,36 +2634,38 @@ def check():
                 else "No local match was found for this exact term."
             )
 
-    return jsonify(
-        {
-            "trademark": term,
-            "country": country,
-            "classes": class_filter,
-            "risk_level": risk,
-            "risk_explanation": risk_explanation,
-            "result_source": result_source,
-            "fallback_used": fallback_used,
-            "fallback_error": fallback_error,
-            "warnings": warnings,
-            "ukipo_manual_search_url": ukipo_manual_search_url,
-            "ukipo_manual_search_term": term,
-            "reference_classes": reference_classes,
-            "match_count": total_similar_count,
-            "total_similar_count": total_similar_count,
-            "returned_count": len(page_matches),
-            "has_more": (similar_offset + len(page_matches)) < total_similar_count,
-            "next_offset": similar_offset + len(page_matches),
-            "patent_count": len(patents),
-            "notes": [
-                "Usage is inferred from status/expiry fields in the dataset; it is not verified market use.",
-                "Owner business type is not provided by the dataset; owner_type is inferred from the owner name.",
-            ],
-            "similar_marks": page_matches,
-            "chosen_class_matches": page_chosen_class_matches,
-            "cross_class_matches": page_cross_class_matches,
-            "patents": patents,
-        }
-    )
+    result = {
+        "trademark": term,
+        "country": country,
+        "classes": class_filter,
+        "risk_level": risk,
+        "risk_explanation": risk_explanation,
+        "result_source": result_source,
+        "fallback_used": fallback_used,
+        "fallback_error": fallback_error,
+        "warnings": warnings,
+        "ukipo_manual_search_url": ukipo_manual_search_url,
+        "ukipo_manual_search_term": term,
+        "reference_classes": reference_classes,
+        "match_count": total_similar_count,
+        "total_similar_count": total_similar_count,
+        "returned_count": len(page_matches),
+        "has_more": (similar_offset + len(page_matches)) < total_similar_count,
+        "next_offset": similar_offset + len(page_matches),
+        "patent_count": len(patents),
+        "notes": [
+            "Usage is inferred from status/expiry fields in the dataset; it is not verified market use.",
+            "Owner business type is not provided by the dataset; owner_type is inferred from the owner name.",
+        ],
+        "similar_marks": page_matches,
+        "chosen_class_matches": page_chosen_class_matches,
+        "cross_class_matches": page_cross_class_matches,
+        "patents": patents,
+    }
+    # A failed live fallback is transient; let the next request retry it.
+    if not fallback_error:
+        store_check_result(cache_key, result)
+    return jsonify(result)
 
 
 @app.route("/warmup")
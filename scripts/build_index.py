@@ -1,10 +1,17 @@
 import csv
+import functools
 import html
+import itertools
+import os
 import re
 import sqlite3
+import string
+import tempfile
 import zipfile
 import xml.etree.ElementTree as ET
-from datetime import datetime, date, timedelta
+from concurrent.futures import ProcessPoolExecutor
+from operator import itemgetter
+from datetime import datetime, date
 from pathlib import Path
 from typing import Optional
 
@@ -25,21 +32,56 @@ HEADER_MAP = {
     "Renewal Due Date": "renewal_due",
 }
 
+MARK_COLUMNS = """
+    reg_no, mark_text, mark_text_norm, owner_name, owner_type,
+    country, status, category, mark_type,
+    filed, published, registered, expired, renewal_due,
+    class_codes, goods_services, source_file
+"""
+PATENT_COLUMNS = """
+    application_number, publication_number, ipsum,
+    earliest_filing_date, filing_date, lodged_date,
+    publication_a_date, publication_b_date,
+    applicant_name, applicant_country_code, applicant_postcode,
+    applicant_county, applicant_region, applicant_country,
+    ipc7, ipc8, pct_filing_date, pct_publication_date,
+    last_renewal_date, last_annuity_year, date_not_in_force,
+    reason_not_in_force, status, source_file
+"""
+
+_MARKS_INSERT_SQL = f"INSERT OR IGNORE INTO marks({MARK_COLUMNS}) VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)"
+_PATENTS_INSERT_SQL = f"INSERT INTO patents({PATENT_COLUMNS}) VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)"
+# Rough ratio of finished index size to raw source size, used to decide
+# whether the build can be assembled in memory.
+IN_MEMORY_SIZE_FACTOR = 3
+
 CLASS_PREFIX = "Class"
-NULL_VALUES = {"", "NULL", "null", "N/A", "n/a"}
+CLASS_NOT_SET = frozenset({"", "0", "No", "N", "False"})
+NULL_VALUES = frozenset({"", "NULL", "null", "N/A", "n/a"})
+
+
+class _SpaceDefaultTable(dict):
+    def __missing__(self, codepoint: int) -> str:
+        return " "
+
+
+_NORM_TABLE = _SpaceDefaultTable({ord(c): c for c in string.ascii_lowercase + string.digits})
 
 
 def norm_text(s: str) -> str:
-    s = (s or "").lower()
-    s = re.sub(r"[^a-z0-9]+", " ", s)
-    s = re.sub(r"\s+", " ", s).strip()
-    return s
+    # Anything outside [a-z0-9] becomes a space, as in the backend's db_norm_text.
+    return " ".join((s or "").lower().translate(_NORM_TABLE).split())
 
 
+@functools.lru_cache(maxsize=65536)
 def parse_date(s: str) -> str:
     s = (s or "").strip()
     if not s:
         return ""
+    # Already YYYY-MM-DD: the slow path below returns these unchanged whether
+    # or not they are a real calendar date, so skip strptime entirely.
+    if len(s) == 10 and s[4] == "-" and s[7] == "-" and s[:4].isdigit() and s[5:7].isdigit() and s[8:].isdigit():
+        return s
     # Expect YYYY-MM-DD, but keep original if not parseable
     try:
         datetime.strptime(s, "%Y-%m-%d")
@@ -68,6 +110,10 @@ def parse_date(s: str) -> str:
     return s
 
 
+EXCEL_EPOCH_ORDINAL = date(1899, 12, 30).toordinal()
+
+
+@functools.lru_cache(maxsize=65536)
 def excel_date_to_iso(s: str) -> str:
     s = (s or "").strip()
     if not s or s in NULL_VALUES:
@@ -76,26 +122,48 @@ def excel_date_to_iso(s: str) -> str:
         val = float(s)
         if val <= 0:
             return ""
-        base = date(1899, 12, 30)
-        d = base + timedelta(days=int(val))
-        return d.isoformat()
+        return date.fromordinal(EXCEL_EPOCH_ORDINAL + int(val)).isoformat()
     except ValueError:
         return s
 
 
-def discover_txt_files(root: Path) -> list[Path]:
-    files = []
-    for path in root.rglob("*.txt"):
-        if path.is_file() and is_trademark_text_file(path):
-            files.append(path)
-    return files
+def discover_source_files(root: Path) -> tuple[list[Path], list[Path], list[Path], list[Path]]:
+    """Find text exports, patent workbooks, journal XML and HTML journal dirs in one walk."""
+    txt_files = []
+    xlsx_files = []
+    xml_files = []
+    html_journal_dirs = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        parent = Path(dirpath)
+        for name in filenames:
+            if name.endswith(".txt"):
+                path = parent / name
+                if path.is_file() and is_trademark_text_file(path):
+                    txt_files.append(path)
+            elif name.endswith(".xlsx"):
+                path = parent / name
+                if path.is_file():
+                    xlsx_files.append(path)
+            elif name.endswith(".xml"):
+                path = parent / name
+                if path.is_file():
+                    xml_files.append(path)
+            elif name == "owner.html" and (parent / "word.html").exists():
+                html_journal_dirs.append(parent)
+    return txt_files, xlsx_files, xml_files, html_journal_dirs
 
 
 def is_trademark_text_file(path: Path) -> bool:
     try:
-        raw = path.read_bytes()[:4096]
-    except Exception:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return False
+    try:
+        raw = os.read(fd, 4096)
+    except OSError:
         return False
+    finally:
+        os.close(fd)
 
     # UTF-16 LE/BE header variants and UTF-8 header variant
     if b"T\x00r\x00a\x00d\x00e\x00 \x00M\x00a\x00r\x00k\x00" in raw:
@@ -107,20 +175,13 @@ def is_trademark_text_file(path: Path) -> bool:
     return False
 
 
-def discover_xlsx_files(root: Path) -> list[Path]:
-    files = []
-    for path in root.rglob("*.xlsx"):
-        if path.is_file():
-            files.append(path)
-    return files
-
-
-def discover_xml_files(root: Path) -> list[Path]:
-    files = []
-    for path in root.rglob("*.xml"):
-        if path.is_file():
-            files.append(path)
-    return files
+def advise_sequential(f) -> None:
+    # Hint the kernel to read ahead aggressively; not available on every OS.
+    if hasattr(os, "posix_fadvise"):
+        try:
+            os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        except OSError:
+            pass
 
 
 def strip_ns(tag: str) -> str:
@@ -129,32 +190,107 @@ def strip_ns(tag: str) -> str:
     return tag
 
 
-def discover_html_journal_dirs(root: Path) -> list[Path]:
-    dirs = []
-    seen = set()
-    for path in root.rglob("owner.html"):
-        parent = path.parent
-        if not parent.is_dir():
-            continue
-        if not (parent / "word.html").exists():
+def xml_root_tag(path: Path) -> str:
+    # The root element's start event comes first; no need to parse the rest
+    # of the document just to learn which export format it is.
+    with open(path, "rb") as f:
+        for event, elem in ET.iterparse(f, events=("start",)):
+            return strip_ns(elem.tag)
+    return ""
+
+
+def iter_elements(source, match):
+    """Yield each fully parsed element whose tag satisfies match(tag), then detach it."""
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb", buffering=READ_BUFFER_BYTES) as f:
+            advise_sequential(f)
+            yield from iter_elements(f, match)
+        return
+
+    parents = []
+    for event, elem in ET.iterparse(source, events=("start", "end")):
+        if event == "start":
+            parents.append(elem)
             continue
-        if parent in seen:
+        parents.pop()
+        if not match(elem.tag):
             continue
-        seen.add(parent)
-        dirs.append(parent)
-    return dirs
+        yield elem
+        if parents:
+            # iterparse builds the tree ahead of the events it has handed out,
+            # so later siblings may already be attached; remove elem itself.
+            # Earlier siblings are gone already, so it sits at the front.
+            parents[-1].remove(elem)
+        else:
+            elem.clear()
 
 
-def connect_db() -> sqlite3.Connection:
-    DB_PATH.parent.mkdir(parents=True, exist_ok=True)
-    con = sqlite3.connect(DB_PATH)
-    con.execute("PRAGMA journal_mode=WAL")
-    con.execute("PRAGMA synchronous=NORMAL")
+def connect_db(path: Path = DB_PATH, in_memory: bool = False) -> sqlite3.Connection:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # isolation_level=None stops the sqlite3 module from inspecting every
+    # statement to open implicit transactions; the builder issues its own
+    # BEGIN/COMMIT around each bulk step instead.
+    con = sqlite3.connect(":memory:" if in_memory else path, isolation_level=None)
+    # The index is always built from scratch (main() deletes the old file), so
+    # there is nothing to protect with a journal or fsyncs: a failed build is
+    # simply rerun. page_size only takes effect before the first table exists.
+    con.execute("PRAGMA page_size=32768")
+    con.execute("PRAGMA journal_mode=OFF")
+    con.execute("PRAGMA synchronous=OFF")
+    con.execute("PRAGMA locking_mode=EXCLUSIVE")
+    con.execute("PRAGMA cache_size=-262144")
+    con.execute("PRAGMA mmap_size=30000000000")
     con.execute("PRAGMA temp_store=MEMORY")
     return con
 
 
-def setup_schema(con: sqlite3.Connection) -> None:
+def available_memory_bytes() -> Optional[int]:
+    # MemAvailable counts reclaimable page cache, unlike SC_AVPHYS_PAGES
+    # (MemFree). macOS has neither, so fall back to total physical memory.
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        return os.sysconf("SC_PHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def fits_in_memory(sources: list[Path]) -> bool:
+    """True if IN_MEMORY_SIZE_FACTOR times the source size fits in half the available memory."""
+    available = available_memory_bytes()
+    if available is None:
+        return False
+    total = 0
+    for source in sources:
+        paths = source.glob("*.html") if source.is_dir() else [source]
+        for path in paths:
+            try:
+                total += path.stat().st_size
+            except OSError:
+                continue
+    return total * IN_MEMORY_SIZE_FACTOR < available // 2
+
+
+def finalize_db(con: sqlite3.Connection, in_memory: bool = False) -> None:
+    con.execute("ANALYZE")
+    con.commit()
+    if in_memory:
+        # Writes the finished database to disk in one sequential pass.
+        con.execute("VACUUM INTO ?", (str(DB_PATH),))
+        con.close()
+        con = sqlite3.connect(DB_PATH)
+    # Ship the file in WAL mode like before so the backend can read it while
+    # writing its fallback cache.
+    con.execute("PRAGMA journal_mode=WAL")
+    con.close()
+
+
+def setup_tables(con: sqlite3.Connection) -> None:
     con.execute(
         """
         CREATE TABLE IF NOT EXISTS marks (
@@ -179,17 +315,6 @@ def setup_schema(con: sqlite3.Connection) -> None:
         )
         """
     )
-    con.execute("CREATE INDEX IF NOT EXISTS idx_marks_country ON marks(country)")
-    con.execute("CREATE INDEX IF NOT EXISTS idx_marks_status ON marks(status)")
-    con.execute("CREATE INDEX IF NOT EXISTS idx_marks_mark_norm ON marks(mark_text_norm)")
-    con.execute("CREATE INDEX IF NOT EXISTS idx_marks_country_mark_text_norm ON marks(country, mark_text_norm)")
-    con.execute(
-        """
-        CREATE VIRTUAL TABLE IF NOT EXISTS marks_fts
-        USING fts5(mark_text, owner_name, content='marks', content_rowid='id')
-        """
-    )
-
     con.execute(
         """
         CREATE TABLE IF NOT EXISTS patents (
@@ -221,47 +346,85 @@ def setup_schema(con: sqlite3.Connection) -> None:
         )
         """
     )
+
+
+def setup_indexes(con: sqlite3.Connection) -> None:
+    # Built once over the loaded tables rather than maintained row by row
+    # during ingest.
+    con.execute("CREATE INDEX IF NOT EXISTS idx_marks_country ON marks(country)")
+    con.execute("CREATE INDEX IF NOT EXISTS idx_marks_status ON marks(status)")
+    con.execute("CREATE INDEX IF NOT EXISTS idx_marks_mark_norm ON marks(mark_text_norm)")
+    con.execute("CREATE INDEX IF NOT EXISTS idx_marks_country_mark_text_norm ON marks(country, mark_text_norm)")
     con.execute("CREATE INDEX IF NOT EXISTS idx_patents_status ON patents(status)")
     con.execute("CREATE INDEX IF NOT EXISTS idx_patents_applicant ON patents(applicant_name)")
-    con.execute(
-        """
-        CREATE VIRTUAL TABLE IF NOT EXISTS patents_fts
-        USING fts5(application_number, publication_number, applicant_name, ipc7, ipc8, content='patents', content_rowid='id')
-        """
-    )
+    con.execute("CREATE INDEX IF NOT EXISTS idx_patents_application_number ON patents(application_number)")
+    con.execute("CREATE INDEX IF NOT EXISTS idx_patents_publication_number ON patents(publication_number)")
+
+
+# Plain substrings of the lowered name, matched anywhere (" inc" also hits
+# " income"), exactly like the old chain of `in` checks but in one scan.
+_COMPANY_MARKER_RE = re.compile(r" (?:ltd|limited|llc|inc|corp|gmbh|plc|llp)| and | & ")
 
 
 def infer_owner_type(name: str) -> str:
     if not name:
         return "unknown"
-    n = name.lower()
-    if any(x in n for x in [" ltd", " limited", " llc", " inc", " corp", " gmbh", " plc", " llp"]):
-        return "company"
-    if " and " in n or " & " in n:
+    if _COMPANY_MARKER_RE.search(name.lower()):
         return "company"
     return "individual_or_other"
 
 
-def build_class_codes(row: dict) -> str:
-    classes = []
-    for k, v in row.items():
-        if k.startswith(CLASS_PREFIX):
+def class_columns(headers: list[str]) -> list[tuple[int, str]]:
+    """(column index, class number) per "ClassN" header; like dict(zip()), repeats read the last column."""
+    positions = {}
+    for i, header in enumerate(headers):
+        positions[header] = i
+    columns = []
+    for header, i in positions.items():
+        if header.startswith(CLASS_PREFIX):
             try:
-                class_num = int(k[len(CLASS_PREFIX):])
+                class_num = int(header[len(CLASS_PREFIX):])
             except ValueError:
                 continue
-            if (v or "").strip() not in ("", "0", "No", "N", "False"):
-                classes.append(str(class_num))
-    return ",".join(classes)
+            columns.append((i, str(class_num)))
+    return columns
+
+
+def build_class_codes(row: list[str], class_cols: list[tuple[int, str]]) -> str:
+    # Most class cells are exactly "" or "0"; only strip the ones that are not.
+    return ",".join(
+        [num for i, num in class_cols if row[i] not in CLASS_NOT_SET and row[i].strip() not in CLASS_NOT_SET]
+    )
+
+
+TEXT_ENCODINGS = ("utf-16", "utf-16-le", "utf-16-be", "utf-8-sig")
+READ_BUFFER_BYTES = 1 << 20
+
+
+def sniff_text_encoding(path: Path) -> str:
+    with path.open("rb") as f:
+        head = f.read(4)
+    if head.startswith((b"\xff\xfe", b"\xfe\xff")):
+        return "utf-16"
+    if head.startswith(b"\xef\xbb\xbf"):
+        return "utf-8-sig"
+    if head[1:2] == b"\x00":
+        return "utf-16-le"
+    if head[:1] == b"\x00":
+        return "utf-16-be"
+    return "utf-8-sig"
 
 
 def read_rows(path: Path):
     # UK IPO exports are pipe-delimited and usually UTF-16.
-    # Some files are UTF-16 without BOM, so we try multiple encodings.
+    # Some files are UTF-16 without BOM, so the encoding is sniffed from the
+    # first bytes and the other candidates are only tried if that fails.
     last_err = None
-    for enc in ("utf-16", "utf-16-le", "utf-16-be", "utf-8-sig"):
+    sniffed = sniff_text_encoding(path)
+    for enc in (sniffed, *[e for e in TEXT_ENCODINGS if e != sniffed]):
         try:
-            with path.open("r", encoding=enc, newline="") as f:
+            with path.open("r", encoding=enc, newline="", buffering=READ_BUFFER_BYTES) as f:
+                advise_sequential(f)
                 reader = csv.reader(f, delimiter="|")
                 headers = next(reader)
                 headers = [h.replace("\ufeff", "").strip() for h in headers]
@@ -280,6 +443,9 @@ def read_rows(path: Path):
     raise ValueError(f"Unsupported or invalid trademark text file: {path} ({last_err})")
 
 
+# A sheet only ever has a few distinct column letters (Excel caps it at 16384),
+# and every row repeats them.
+@functools.lru_cache(maxsize=16384)
 def col_to_index(col: str) -> int:
     idx = 0
     for ch in col:
@@ -290,29 +456,29 @@ def col_to_index(col: str) -> int:
 
 def read_xlsx_rows(path: Path):
     ns = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+    si_tag = ns + "si"
+    t_path = ".//" + ns + "t"
+    row_tag = ns + "row"
+    c_tag = ns + "c"
+    v_tag = ns + "v"
     with zipfile.ZipFile(path) as z:
         shared = []
         if "xl/sharedStrings.xml" in z.namelist():
-            for event, elem in ET.iterparse(z.open("xl/sharedStrings.xml")):
-                if elem.tag == ns + "si":
-                    texts = [t.text or "" for t in elem.findall(".//" + ns + "t")]
-                    shared.append("".join(texts))
-                    elem.clear()
+            for elem in iter_elements(z.open("xl/sharedStrings.xml"), si_tag.__eq__):
+                shared.append("".join([t.text or "" for t in elem.iterfind(t_path)]))
 
         sheet = "xl/worksheets/sheet1.xml"
-        headers = None
-        for event, elem in ET.iterparse(z.open(sheet)):
-            if elem.tag != ns + "row":
-                continue
-            cells = elem.findall(ns + "c")
-            row = {}
-            for c in cells:
-                ref = c.get("r") or ""
-                col_letters = "".join([ch for ch in ref if ch.isalpha()])
+        for elem in iter_elements(z.open(sheet), row_tag.__eq__):
+            # Cells arrive in column order with gaps for blanks; collect them
+            # as (index, value) and pad into a dense row once at the end.
+            cells = []
+            max_idx = -1
+            for c in elem.iterfind(c_tag):
+                col_letters = (c.get("r") or "").rstrip("0123456789")
                 if not col_letters:
                     continue
                 idx = col_to_index(col_letters)
-                v = c.find(ns + "v")
+                v = c.find(v_tag)
                 if v is None:
                     val = ""
                 else:
@@ -322,181 +488,165 @@ def read_xlsx_rows(path: Path):
                             val = shared[int(val)]
                         except Exception:
                             val = ""
-                row[idx] = val
+                cells.append((idx, val))
+                if idx > max_idx:
+                    max_idx = idx
 
-            if headers is None:
-                max_idx = max(row.keys()) if row else -1
-                headers = [row.get(i, "") for i in range(max_idx + 1)]
-                yield headers
-            else:
-                max_idx = max(row.keys()) if row else -1
-                values = [row.get(i, "") for i in range(max_idx + 1)]
-                yield values
-
-            elem.clear()
+            values = [""] * (max_idx + 1)
+            for idx, val in cells:
+                if idx >= 0:
+                    values[idx] = val
+            yield values
 
 
-def ingest_file(con: sqlite3.Connection, path: Path) -> None:
+def text_export_rows(path: Path):
     headers = None
-    batch = []
-    total = 0
     is_uk_domestic_export = path.name in {"OpenDataDomestic.txt", "OpenDataDomestic 2.txt"}
 
     for row in read_rows(path):
         if headers is None:
             headers = row
+            width = len(headers)
+            class_cols = class_columns(headers)
+            # Last column wins for a repeated header, as it did with
+            # dict(zip(headers, row)). Fields come back in HEADER_MAP order;
+            # headers missing from this file point one past the end, where each
+            # row gets a blank appended.
+            positions = {header: i for i, header in enumerate(headers)}
+            has_missing = any(header not in positions for header in HEADER_MAP)
+            get_fields = itemgetter(*[positions.get(header, width) for header in HEADER_MAP])
             continue
         # Pad or trim
-        if len(row) < len(headers):
-            row = row + [""] * (len(headers) - len(row))
-        elif len(row) > len(headers):
-            row = row[: len(headers)]
-        data = dict(zip(headers, row))
-
-        reg_no = (data.get("Trade Mark") or "").strip()
-        mark_text = (data.get("Mark Text") or "").strip()
-        owner_name = (data.get("Name") or "").strip()
-        country = "United Kingdom" if is_uk_domestic_export else (data.get("Country") or "").strip()
-        status = (data.get("Status") or "").strip()
-        category = (data.get("Category of Mark") or "").strip()
-        mark_type = (data.get("Mark Type") or "").strip()
-
-        filed = parse_date(data.get("Filed") or "")
-        published = parse_date(data.get("Published") or "")
-        registered = parse_date(data.get("Registered") or "")
-        expired = parse_date(data.get("Expired") or "")
-        renewal_due = parse_date(data.get("Renewal Due Date") or "")
+        if len(row) < width:
+            row = row + [""] * (width - len(row))
+        elif len(row) > width:
+            row = row[:width]
+        if has_missing:
+            row.append("")
+
+        (
+            reg_no,
+            mark_text,
+            owner_name,
+            country,
+            status,
+            category,
+            mark_type,
+            filed,
+            published,
+            registered,
+            expired,
+            renewal_due,
+        ) = get_fields(row)
+        reg_no = reg_no.strip()
+        mark_text = mark_text.strip()
+        owner_name = owner_name.strip()
+        country = "United Kingdom" if is_uk_domestic_export else country.strip()
+        status = status.strip()
+        category = category.strip()
+        mark_type = mark_type.strip()
+
+        filed = parse_date(filed)
+        published = parse_date(published)
+        registered = parse_date(registered)
+        expired = parse_date(expired)
+        renewal_due = parse_date(renewal_due)
 
         mark_text_norm = norm_text(mark_text)
         owner_type = infer_owner_type(owner_name)
-        class_codes = build_class_codes(data)
-
-        batch.append(
-            (
-                reg_no,
-                mark_text,
-                mark_text_norm,
-                owner_name,
-                owner_type,
-                country,
-                status,
-                category,
-                mark_type,
-                filed,
-                published,
-                registered,
-                expired,
-                renewal_due,
-                class_codes,
-                "",
-                str(path),
-            )
+        class_codes = build_class_codes(row, class_cols)
+
+        yield (
+            reg_no,
+            mark_text,
+            mark_text_norm,
+            owner_name,
+            owner_type,
+            country,
+            status,
+            category,
+            mark_type,
+            filed,
+            published,
+            registered,
+            expired,
+            renewal_due,
+            class_codes,
+            "",
+            str(path),
         )
 
-        if len(batch) >= 5000:
-            insert_batch(con, batch)
-            total += len(batch)
-            batch.clear()
-
-    if batch:
-        insert_batch(con, batch)
-        total += len(batch)
 
+def ingest_file(con: sqlite3.Connection, path: Path) -> None:
+    total = insert_rows(con, _MARKS_INSERT_SQL, text_export_rows(path))
     print(f"Ingested {total} rows from {path}")
 
 
-def clean_cell(v: str) -> str:
-    v = (v or "").strip()
-    if v in NULL_VALUES:
-        return ""
-    return v
-
-
-def ingest_patents(con: sqlite3.Connection, path: Path) -> None:
+# Workbook headers in patents table column order, and whether each holds an
+# Excel date serial.
+PATENT_HEADERS = (
+    ("Application number", False),
+    ("Publication number", False),
+    ("IPSUM", False),
+    ("Earliest filing date", True),
+    ("Filing date", True),
+    ("Lodged date", True),
+    ("A publication date", True),
+    ("B publication date", True),
+    ("Applicant name", False),
+    ("Applicant Country code", False),
+    ("Applicant postcode", False),
+    ("Applicant county", False),
+    ("Applicant region", False),
+    ("Applicant country", False),
+    ("IPC7", False),
+    ("IPC8", False),
+    ("PCT filing date", True),
+    ("PCT publication date", True),
+    ("Last renewal date", True),
+    ("Last annuity year", False),
+    ("Date not in force", True),
+    ("Reason not in force", False),
+    ("Status", False),
+)
+PATENT_DATE_FLAGS = tuple(is_date for _, is_date in PATENT_HEADERS)
+
+
+def patent_rows(path: Path):
     headers = None
-    batch = []
-    total = 0
+    source_file = str(path)
 
     for row in read_xlsx_rows(path):
         if headers is None:
             headers = row
+            width = len(headers)
+            # Same lookup rules as the text exports: last column wins for a
+            # repeated header, missing headers read a blank appended per row.
+            positions = {header: i for i, header in enumerate(headers)}
+            has_missing = any(header not in positions for header, _ in PATENT_HEADERS)
+            get_fields = itemgetter(*[positions.get(header, width) for header, _ in PATENT_HEADERS])
             continue
         if not row:
             continue
 
-        if len(row) < len(headers):
-            row = row + [""] * (len(headers) - len(row))
-        data = dict(zip(headers, row))
-
-        def get(key: str) -> str:
-            return clean_cell(data.get(key, ""))
-
-        batch.append(
-            (
-                get("Application number"),
-                get("Publication number"),
-                get("IPSUM"),
-                excel_date_to_iso(get("Earliest filing date")),
-                excel_date_to_iso(get("Filing date")),
-                excel_date_to_iso(get("Lodged date")),
-                excel_date_to_iso(get("A publication date")),
-                excel_date_to_iso(get("B publication date")),
-                get("Applicant name"),
-                get("Applicant Country code"),
-                get("Applicant postcode"),
-                get("Applicant county"),
-                get("Applicant region"),
-                get("Applicant country"),
-                get("IPC7"),
-                get("IPC8"),
-                excel_date_to_iso(get("PCT filing date")),
-                excel_date_to_iso(get("PCT publication date")),
-                excel_date_to_iso(get("Last renewal date")),
-                get("Last annuity year"),
-                excel_date_to_iso(get("Date not in force")),
-                get("Reason not in force"),
-                get("Status"),
-                str(path),
-            )
+        if len(row) < width:
+            row = row + [""] * (width - len(row))
+        if has_missing:
+            row = row[:width]
+            row.append("")
+
+        cells = [cell.strip() for cell in get_fields(row)]
+        yield (
+            *[
+                excel_date_to_iso(cell) if is_date else ("" if cell in NULL_VALUES else cell)
+                for cell, is_date in zip(cells, PATENT_DATE_FLAGS)
+            ],
+            source_file,
         )
 
-        if len(batch) >= 5000:
-            con.executemany(
-                """
-                INSERT INTO patents(
-                    application_number, publication_number, ipsum,
-                    earliest_filing_date, filing_date, lodged_date,
-                    publication_a_date, publication_b_date,
-                    applicant_name, applicant_country_code, applicant_postcode,
-                    applicant_county, applicant_region, applicant_country,
-                    ipc7, ipc8, pct_filing_date, pct_publication_date,
-                    last_renewal_date, last_annuity_year, date_not_in_force,
-                    reason_not_in_force, status, source_file
-                ) VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)
-                """,
-                batch,
-            )
-            total += len(batch)
-            batch.clear()
-
-    if batch:
-        con.executemany(
-            """
-            INSERT INTO patents(
-                application_number, publication_number, ipsum,
-                earliest_filing_date, filing_date, lodged_date,
-                publication_a_date, publication_b_date,
-                applicant_name, applicant_country_code, applicant_postcode,
-                applicant_county, applicant_region, applicant_country,
-                ipc7, ipc8, pct_filing_date, pct_publication_date,
-                last_renewal_date, last_annuity_year, date_not_in_force,
-                reason_not_in_force, status, source_file
-            ) VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)
-            """,
-            batch,
-        )
-        total += len(batch)
 
+def ingest_patents(con: sqlite3.Connection, path: Path) -> None:
+    total = insert_rows(con, _PATENTS_INSERT_SQL, patent_rows(path))
     print(f"Ingested {total} patent rows from {path}")
 
 
@@ -514,36 +664,30 @@ def normalize_country_from_office(reg_no: str, office_code: str) -> str:
     return "Rest of World"
 
 
-def ingest_journal_xml(con: sqlite3.Connection, path: Path) -> None:
-    batch = []
-    total = 0
+def child_text(elem: ET.Element, path: str, namespaces: Optional[dict] = None) -> str:
+    child = elem.find(path, namespaces)
+    return (child.text or "").strip() if child is not None else ""
+
 
-    root_tag = strip_ns(ET.parse(path).getroot().tag)
-    is_ukipo_export = root_tag == "MarkLicenceeExportList"
+def journal_xml_rows(path: Path):
+    is_ukipo_export = xml_root_tag(path) == "MarkLicenceeExportList"
 
     if is_ukipo_export:
         ns = {"tm": "http://www.ipo.gov.uk/schemas/tm"}
 
-        for event, elem in ET.iterparse(path, events=("end",)):
-            if strip_ns(elem.tag) != "TradeMark":
-                continue
-
-            def text_at(tag: str) -> str:
-                child = elem.find(tag, ns)
-                return (child.text or "").strip() if child is not None and child.text else ""
-
-            reg_no = text_at("tm:ApplicationNumber")
-            app_date = text_at("tm:ApplicationDateTime")
-            published = text_at("./tm:PublicationDetails/tm:Publication/tm:PublicationDate")
-            registered = text_at("tm:RegistrationDate")
-            expired = text_at("tm:ExpiryDate")
-            status = text_at("tm:IPOPublicMarkCurrentStatusCode")
-            mark_type = text_at("tm:MarkFeature")
-            kind_mark = text_at("tm:KindMark")
+        for elem in iter_elements(path, lambda tag: strip_ns(tag) == "TradeMark"):
+            reg_no = child_text(elem, "tm:ApplicationNumber", ns)
+            app_date = child_text(elem, "tm:ApplicationDateTime", ns)
+            published = child_text(elem, "./tm:PublicationDetails/tm:Publication/tm:PublicationDate", ns)
+            registered = child_text(elem, "tm:RegistrationDate", ns)
+            expired = child_text(elem, "tm:ExpiryDate", ns)
+            status = child_text(elem, "tm:IPOPublicMarkCurrentStatusCode", ns)
+            mark_type = child_text(elem, "tm:MarkFeature", ns)
+            kind_mark = child_text(elem, "tm:KindMark", ns)
             office_code = "UK"
 
-            mark_text = text_at("./tm:WordMarkSpecification/tm:MarkVerbalElementText")
-            applicant = text_at("./tm:ApplicantDetails/tm:Applicant/tm:Name")
+            mark_text = child_text(elem, "./tm:WordMarkSpecification/tm:MarkVerbalElementText", ns)
+            applicant = child_text(elem, "./tm:ApplicantDetails/tm:Applicant/tm:Name", ns)
 
             class_nums = []
             goods_parts = []
@@ -576,48 +720,32 @@ def ingest_journal_xml(con: sqlite3.Connection, path: Path) -> None:
             # should not control jurisdiction filtering for the UK-only checker.
             country = "United Kingdom"
 
-            batch.append(
-                (
-                    reg_no,
-                    mark_text,
-                    mark_text_norm,
-                    applicant,
-                    owner_type,
-                    country,
-                    status or "Published",
-                    "",
-                    mark_type or kind_mark,
-                    parse_date(app_date),
-                    parse_date(published),
-                    parse_date(registered),
-                    parse_date(expired),
-                    "",
-                    class_codes,
-                    goods_services,
-                    str(path),
-                )
+            yield (
+                reg_no,
+                mark_text,
+                mark_text_norm,
+                applicant,
+                owner_type,
+                country,
+                status or "Published",
+                "",
+                mark_type or kind_mark,
+                parse_date(app_date),
+                parse_date(published),
+                parse_date(registered),
+                parse_date(expired),
+                "",
+                class_codes,
+                goods_services,
+                str(path),
             )
-
-            if len(batch) >= 5000:
-                insert_batch(con, batch)
-                total += len(batch)
-                batch.clear()
-
-            elem.clear()
     else:
-        for event, elem in ET.iterparse(path, events=("end",)):
-            if elem.tag != "TradeMark":
-                continue
-
-            def text_at(tag: str) -> str:
-                child = elem.find(tag)
-                return (child.text or "").strip() if child is not None else ""
-
-            reg_no = text_at("RegistrationNumber")
-            app_date = text_at("ApplicationDate")
-            office_code = text_at("RegistrationOfficeCode")
-            mark_type = text_at("MarkFeature")
-            kind_mark = text_at("KindMark")
+        for elem in iter_elements(path, "TradeMark".__eq__):
+            reg_no = child_text(elem, "RegistrationNumber")
+            app_date = child_text(elem, "ApplicationDate")
+            office_code = child_text(elem, "RegistrationOfficeCode")
+            mark_type = child_text(elem, "MarkFeature")
+            kind_mark = child_text(elem, "KindMark")
 
             mark_text = ""
             wm = elem.find("./WordMarkSpecification/MarkVerbalElementText")
@@ -646,39 +774,29 @@ def ingest_journal_xml(con: sqlite3.Connection, path: Path) -> None:
             owner_type = infer_owner_type(applicant)
             country = normalize_country_from_office(reg_no, office_code)
 
-            batch.append(
-                (
-                    reg_no,
-                    mark_text,
-                    mark_text_norm,
-                    applicant,
-                    owner_type,
-                    country,
-                    "Published",
-                    "",
-                    mark_type or kind_mark,
-                    parse_date(app_date),
-                    parse_date(app_date),
-                    "",
-                    "",
-                    "",
-                    class_codes,
-                    goods_services,
-                    str(path),
-                )
+            yield (
+                reg_no,
+                mark_text,
+                mark_text_norm,
+                applicant,
+                owner_type,
+                country,
+                "Published",
+                "",
+                mark_type or kind_mark,
+                parse_date(app_date),
+                parse_date(app_date),
+                "",
+                "",
+                "",
+                class_codes,
+                goods_services,
+                str(path),
             )
 
-            if len(batch) >= 5000:
-                insert_batch(con, batch)
-                total += len(batch)
-                batch.clear()
-
-            elem.clear()
-
-    if batch:
-        insert_batch(con, batch)
-        total += len(batch)
 
+def ingest_journal_xml(con: sqlite3.Connection, path: Path) -> None:
+    total = insert_rows(con, _MARKS_INSERT_SQL, journal_xml_rows(path))
     print(f"Ingested {total} journal rows from {path}")
 
 
@@ -768,8 +886,6 @@ def parse_html_mark_page(path: Path) -> Optional[tuple]:
 
 
 def ingest_journal_html_dir(con: sqlite3.Connection, dir_path: Path) -> None:
-    batch = []
-    total = 0
     skipped = 0
 
     detail_files = []
@@ -779,39 +895,44 @@ def ingest_journal_html_dir(con: sqlite3.Connection, dir_path: Path) -> None:
             continue
         detail_files.append(path)
 
-    for path in sorted(detail_files):
-        parsed = parse_html_mark_page(path)
-        if parsed is None:
-            skipped += 1
-            continue
-        batch.append(parsed)
+    def rows():
+        nonlocal skipped
+        for path in sorted(detail_files):
+            parsed = parse_html_mark_page(path)
+            if parsed is None:
+                skipped += 1
+                continue
+            yield parsed
 
-        if len(batch) >= 5000:
-            insert_batch(con, batch)
-            total += len(batch)
-            batch.clear()
+    total = insert_rows(con, _MARKS_INSERT_SQL, rows())
+    print(f"Ingested {total} offline journal rows from {dir_path} (skipped {skipped})")
 
-    if batch:
-        insert_batch(con, batch)
-        total += len(batch)
 
-    print(f"Ingested {total} offline journal rows from {dir_path} (skipped {skipped})")
+def insert_rows(con: sqlite3.Connection, sql: str, rows) -> int:
+    """executemany from a row generator; returns how many rows it consumed."""
+    consumed = itertools.count()
+    con.executemany(sql, (row for row, _ in zip(rows, consumed)))
+    return next(consumed)
 
 
-def insert_batch(con: sqlite3.Connection, batch: list[tuple]) -> None:
-    con.executemany(
+def create_fts_tables(con: sqlite3.Connection) -> None:
+    # External-content tables over the loaded rows, populated by rebuild_fts.
+    # The default unicode61 tokenizer (remove_diacritics 1) and no prefix=
+    # indexes are deliberate: changing the tokenizer would change what the
+    # backend's "token*" queries match, and prefix indexes add a lot to build
+    # time and file size.
+    con.execute(
+        """
+        CREATE VIRTUAL TABLE IF NOT EXISTS marks_fts
+        USING fts5(mark_text, owner_name, content='marks', content_rowid='id')
+        """
+    )
+    con.execute(
+        """
+        CREATE VIRTUAL TABLE IF NOT EXISTS patents_fts
+        USING fts5(application_number, publication_number, applicant_name, ipc7, ipc8, content='patents', content_rowid='id')
         """
-        INSERT OR IGNORE INTO marks(
-            reg_no, mark_text, mark_text_norm, owner_name, owner_type,
-            country, status, category, mark_type,
-            filed, published, registered, expired, renewal_due,
-            class_codes, goods_services, source_file
-        ) VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?, ?,?)
-        """,
-        batch,
     )
-    # Insert into FTS using last inserted rowids
-    # We can refresh FTS content from marks after inserts for simplicity
 
 
 def rebuild_fts(con: sqlite3.Connection) -> None:
@@ -820,12 +941,40 @@ def rebuild_fts(con: sqlite3.Connection) -> None:
     con.execute("INSERT INTO patents_fts(patents_fts) VALUES('rebuild')")
 
 
+def ingest_to_staging(ingest, source: Path, staging_path: Path) -> Path:
+    # Runs in a worker process: parse one source into its own throwaway
+    # database so workers never contend for the main file.
+    con = connect_db(staging_path)
+    setup_tables(con)
+    con.execute("BEGIN")
+    ingest(con, source)
+    con.commit()
+    con.close()
+    return staging_path
+
+
+def merge_staging(con: sqlite3.Connection, staging_path: Path) -> None:
+    # ATTACH is not allowed inside a transaction. Rows are copied in staging id
+    # order and staged files are merged in discovery order, so ids and the
+    # first-wins reg_no dedupe come out the same as a sequential build.
+    con.commit()
+    con.execute("ATTACH DATABASE ? AS staging", (str(staging_path),))
+    try:
+        con.execute("BEGIN")
+        con.execute(
+            f"INSERT OR IGNORE INTO marks({MARK_COLUMNS}) SELECT {MARK_COLUMNS} FROM staging.marks ORDER BY id"
+        )
+        con.execute(
+            f"INSERT INTO patents({PATENT_COLUMNS}) SELECT {PATENT_COLUMNS} FROM staging.patents ORDER BY id"
+        )
+        con.commit()
+    finally:
+        con.execute("DETACH DATABASE staging")
+
+
 def main() -> None:
     root = Path(".")
-    files = discover_txt_files(root)
-    xlsx_files = discover_xlsx_files(root)
-    xml_files = discover_xml_files(root)
-    html_journal_dirs = discover_html_journal_dirs(root)
+    files, xlsx_files, xml_files, html_journal_dirs = discover_source_files(root)
     if not files and not xlsx_files and not xml_files and not html_journal_dirs:
         print("No data files found for ingestion.")
         return
@@ -833,25 +982,35 @@ def main() -> None:
     if DB_PATH.exists():
         DB_PATH.unlink()
 
-    con = connect_db()
-    setup_schema(con)
-
-    for path in files:
-        ingest_file(con, path)
-
-    for path in xlsx_files:
-        ingest_patents(con, path)
-
-    for path in xml_files:
-        ingest_journal_xml(con, path)
-
-    for dir_path in html_journal_dirs:
-        ingest_journal_html_dir(con, dir_path)
+    jobs = (
+        [(ingest_file, path) for path in files]
+        + [(ingest_patents, path) for path in xlsx_files]
+        + [(ingest_journal_xml, path) for path in xml_files]
+        + [(ingest_journal_html_dir, dir_path) for dir_path in html_journal_dirs]
+    )
 
+    in_memory = fits_in_memory([source for _, source in jobs])
+    con = connect_db(in_memory=in_memory)
+    setup_tables(con)
+
+    with tempfile.TemporaryDirectory(dir=DB_PATH.parent) as staging_dir:
+        with ProcessPoolExecutor(max_workers=min(len(jobs), os.cpu_count() or 1)) as pool:
+            futures = [
+                pool.submit(ingest_to_staging, ingest, source, Path(staging_dir) / f"{i}.sqlite")
+                for i, (ingest, source) in enumerate(jobs)
+            ]
+            for future in futures:
+                staging_path = future.result()
+                merge_staging(con, staging_path)
+                staging_path.unlink()
+
+    # Indexes, both FTS rebuilds and ANALYZE run in one transaction.
+    con.execute("BEGIN")
+    setup_indexes(con)
+    create_fts_tables(con)
     rebuild_fts(con)
-    con.commit()
-    con.close()
-    print(f"Index built at {DB_PATH}")
+    finalize_db(con, in_memory)
+    print(f"Index built at {DB_PATH}" + (" (assembled in memory)" if in_memory else ""))
 
 
 if __name__ == "__main__":